@@ -1,4 +1,5 @@
 import logging
+import os
 
 from ableton.v3.base import listens
 from ableton.v3.control_surface import (
@@ -6,11 +7,20 @@ from ableton.v3.control_surface import (
     ControlSurfaceSpecification,
     ElementsBase,
     MapMode,
-    Skin,
 )
-from ableton.v3.control_surface.elements import SimpleColor
+from ableton.v3.control_surface.elements import ButtonMatrixElement, SimpleColor
 from ableton.v3.control_surface.mode import ModesComponent
 
+from .bank_cache import CachedBankDeviceComponent
+from .benchmark import allocation_failures, measure_input_allocations, synthetic_ccs
+from .favorites import FavoritesComponent
+from .feedback import create_rate_limited_encoder
+from .hardware_config import HardwareConfigUploader
+from .overview import NUM_BLOCKS, SessionOverviewComponent
+from .rate_limiter import FeedbackRateLimiter
+from .skin import THEME_FILE, ThemedSkin
+from .track_colors import TrackSelectComponent
+
 logger = logging.getLogger(__name__)
 
 def log(msg):
@@ -81,43 +91,110 @@ class Colors(object):
             On = RGB.ORANGE
             Off = RGB.OFF
 
+        class Favoritesmode(object):
+            On = RGB.PINK
+            Off = RGB.OFF
+
+        class Overviewmode(object):
+            On = RGB.AQUA
+            Off = RGB.OFF
+
+    class Overview(object):
+        Armed = RGB.RED
+        Soloed = RGB.DARK_BLUE
+        Playing = RGB.GREEN
+        Tracks = RGB.LIGHT_BLUE
+        Empty = RGB.OFF
+
+
+# Several Twisters can be driven as one wide surface. Every unit shares the
+# same MIDI port and sends on its own Twister bank, i.e. unit k uses the
+# identifiers 16*k..16*k+15 on the encoder and button channels.
+NUM_DEVICES = 1
+TRACKS_PER_DEVICE = 8
+CONTROLS_PER_DEVICE = 16
+MAX_DEVICES = 4
+
+ENCODER_CHANNEL = 0
+BUTTON_CHANNEL = 1
+ENCODER_MAP_MODE = MapMode.absolute
+# Encoder rings are refreshed by the script, at most this many times per second.
+FEEDBACK_MAX_REFRESH_RATE = 30
+
+
+def unit_name(base_name, unit):
+    if unit == 0:
+        return base_name
+    return f"{base_name}_unit_{unit}"
+
 
 class TwisterElements(ElementsBase):
 
     def reset_leds(self):
-        for btn in self.buttons_raw:
-            btn.reset()
+        for unit in range(NUM_DEVICES):
+            for btn in getattr(self, unit_name("buttons", unit) + "_raw"):
+                btn.reset()
 
-        for enc in self.encoders_raw:
-            enc.reset()
+            for enc in getattr(self, unit_name("encoders", unit) + "_raw"):
+                enc.reset()
 
     def __init__(self, *a, **k):
         super().__init__(*a, **k)
+        assert 0 < NUM_DEVICES <= MAX_DEVICES, f"NUM_DEVICES should be in [1, {MAX_DEVICES}]"
+        self.feedback_limiter = FeedbackRateLimiter(
+            CONTROLS_PER_DEVICE * NUM_DEVICES,
+            max_refresh_rate=FEEDBACK_MAX_REFRESH_RATE,
+        )
+
+        for unit in range(NUM_DEVICES):
+            self._add_unit(unit)
+
+        self._add_spanned_matrix("track_encoders", "encoders")
+        self._add_spanned_matrix("track_buttons", "buttons")
+        self.overview_buttons = ButtonMatrixElement(
+            rows=[self.buttons_raw[:NUM_BLOCKS]], name="Overview_Buttons"
+        )
 
+    def _add_unit(self, unit):
         ids = []
         for row in range(4):
             ids.append([])
             for col in range(4):
-                ids[-1].append(col+4*row)
+                ids[-1].append(col + 4*row + CONTROLS_PER_DEVICE*unit)
 
+        encoders = unit_name("encoders", unit)
         self.add_encoder_matrix(
             identifiers=ids,
-            base_name="encoders",
-            channels=0,
+            base_name=encoders,
+            channels=ENCODER_CHANNEL,
+            map_mode=ENCODER_MAP_MODE,
             needs_takeover=False,
-            is_feedback_enabled=True,
+            is_feedback_enabled=False,
+            element_factory=create_rate_limited_encoder,
+            feedback_limiter=self.feedback_limiter,
         )
-        self.add_submatrix(self.encoders, "top_encoders", columns=(0, 4), rows=(0, 2))
-        self.add_submatrix(self.encoders, "bottom_encoders", columns=(0, 4), rows=(2, 4))
-
+        encoders = getattr(self, encoders)
+        self.add_submatrix(encoders, unit_name("top_encoders", unit), columns=(0, 4), rows=(0, 2))
+        self.add_submatrix(encoders, unit_name("bottom_encoders", unit), columns=(0, 4), rows=(2, 4))
 
+        buttons = unit_name("buttons", unit)
         self.add_button_matrix(
             identifiers=ids,
-            base_name="buttons",
-            channels=1,
+            base_name=buttons,
+            channels=BUTTON_CHANNEL,
         )
-        self.add_submatrix(self.buttons, "top_buttons", columns=(0, 4), rows=(0, 2))
-        self.add_submatrix(self.buttons, "bottom_buttons", columns=(0, 4), rows=(2, 4))
+        buttons = getattr(self, buttons)
+        self.add_submatrix(buttons, unit_name("top_buttons", unit), columns=(0, 4), rows=(0, 2))
+        self.add_submatrix(buttons, unit_name("bottom_buttons", unit), columns=(0, 4), rows=(2, 4))
+
+    def _add_spanned_matrix(self, name, base_name):
+        """Single row holding the top half of every unit, one track per control."""
+        elements = []
+        for unit in range(NUM_DEVICES):
+            raw = getattr(self, unit_name(base_name, unit) + "_raw")
+            elements.extend(raw[:TRACKS_PER_DEVICE])
+        matrix = ButtonMatrixElement(rows=[elements], name=name.title())
+        setattr(self, name, matrix)
 
 
 def create_mappings(control_surface):
@@ -139,9 +216,13 @@ def create_mappings(control_surface):
         "cycle_mode_button": "buttons_raw[12]",
     }
 
+    track_select = lambda: {
+        "component": "Track_Select",
+        "track_select_buttons": "track_buttons",
+    }
+
     select_tracks = lambda: {
         "component": "Mixer",
-        "track_select_buttons": "top_buttons",
         "target_track_send_controls": "bottom_encoders",
         "target_track_mute_button": "buttons_raw[8]",
         "target_track_solo_button": "buttons_raw[9]",
@@ -155,8 +236,9 @@ def create_mappings(control_surface):
             "modes": [
                 {
                     "component": "Mixer",
-                    "volume_controls": "top_encoders",
+                    "volume_controls": "track_encoders",
                 },
+                track_select(),
                 select_tracks(),
                 session_nav(),
                 cycle_mixer_mode(),
@@ -166,8 +248,9 @@ def create_mappings(control_surface):
             "modes": [
                 {
                     "component": "Mixer",
-                    "pan_controls": "top_encoders",
+                    "pan_controls": "track_encoders",
                 },
+                track_select(),
                 select_tracks(),
                 session_nav(),
                 cycle_mixer_mode(),
@@ -209,22 +292,55 @@ def create_mappings(control_surface):
                 },
             ]
         },
+        "FavoritesMode": {
+            "modes": [
+                lambda: control_surface.elements.reset_leds(),
+                cycle_control_mode(),
+                {
+                    "component": "Favorites",
+                    "parameter_controls": "encoders",
+                },
+            ]
+        },
+        "OverviewMode": {
+            "modes": [
+                lambda: control_surface.elements.reset_leds(),
+                cycle_control_mode(),
+                {
+                    "component": "Session_Overview",
+                    "block_buttons": "overview_buttons",
+                },
+            ]
+        },
     }
     return mappings
 
 SYSEX_START = 240
+BENCHMARK_ENV_VAR = "MGTWISTER2_BENCHMARK"
 
 class Specification(ControlSurfaceSpecification):
     elements_type = TwisterElements
-    num_tracks = 8
+    num_tracks = TRACKS_PER_DEVICE * NUM_DEVICES
     num_scenes = 1
     link_session_ring_to_track_selection = False
     link_session_ring_to_scene_selection = False
     include_returns = True
-    control_surface_skin = Skin(Colors)
+    control_surface_skin = ThemedSkin(Colors)
     parameter_bank_size = 16
     create_mappings_function = create_mappings
     custom_identity_response = bytes(SYSEX_START)
+    num_devices = NUM_DEVICES
+    encoder_channel = ENCODER_CHANNEL
+    button_channel = BUTTON_CHANNEL
+    relative_encoders = ENCODER_MAP_MODE != MapMode.absolute
+    active_color = RGB.TURQUOISE.midi_value
+    inactive_color = RGB.OFF.midi_value
+    component_map = {
+        "Device": CachedBankDeviceComponent,
+        "Favorites": FavoritesComponent,
+        "Session_Overview": SessionOverviewComponent,
+        "Track_Select": TrackSelectComponent,
+    }
 
 
 
@@ -246,11 +362,56 @@ class MGTwister2(ControlSurface):
         super().setup()
         device = self.component_map["Device"]
         device._banking_info._num_simultaneous_banks = 1
+        self.load_theme()
+        if os.environ.get(BENCHMARK_ENV_VAR):
+            self.run_input_benchmark()
 
         log(f"banking info {device._banking_info}")
         log(f"num sim {device._banking_info._num_simultaneous_banks}")
         log(f"bank registry {self.device_bank_registry}")
 
+    def update_display(self):
+        super().update_display()
+        self.elements.feedback_limiter.flush()
+
+    def log_feedback_counters(self):
+        log(f"encoder ring feedback: {self.elements.feedback_limiter.describe_counters()}")
+
+    def disconnect(self):
+        self.log_feedback_counters()
+        super().disconnect()
+
+    def run_input_benchmark(self):
+        """Feeds synthetic encoder and track select CCs through the input path
+        and checks that steady-state handling does not allocate. This moves
+        the mapped parameters, only run it on a scratch set."""
+        messages = synthetic_ccs(
+            encoder_channel=ENCODER_CHANNEL,
+            encoder_ids=range(CONTROLS_PER_DEVICE * NUM_DEVICES),
+            button_channel=BUTTON_CHANNEL,
+            button_ids=range(TRACKS_PER_DEVICE),
+        )
+        with self.component_guard():
+            stats = measure_input_allocations(self.receive_midi, messages)
+        log(f"input benchmark {stats}")
+        self.log_feedback_counters()
+        for failure in allocation_failures(stats):
+            log(f"input benchmark failed: {failure}")
+
+    def port_settings_changed(self):
+        # Identification never completes with the current identity response,
+        # so the config goes out whenever Live (re)connects the MIDI ports.
+        super().port_settings_changed()
+        self.upload_hardware_config()
+
+    def upload_hardware_config(self, force=False):
+        HardwareConfigUploader(self._send_midi).upload(self.specification, force=force)
+
+    def load_theme(self, path=THEME_FILE):
+        if self.specification.control_surface_skin.load_theme(path):
+            log(f"loaded theme {path}")
+            self.update()
+
     #     self.component_map['Background'] = self._background
     #     self.component_map['Target_Track'] = self._target_track
     #     log(f"target track {self._target_track}")
@@ -0,0 +1,198 @@
+import os
+import zlib
+
+from ableton.v2.control_surface.device_parameter_bank import DescribedDeviceParameterBank, DeviceParameterBank
+from ableton.v3.base import listens, liveobj_valid
+from ableton.v3.control_surface.components import DeviceComponent
+
+from .storage import cache_path, load_json, save_json
+
+BANK_SIZE = 16
+BANK_CACHE_FILE = "bank_layouts.json"
+BANK_CUSTOMIZATIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bank_customizations.json")
+NO_PARAMETER = -1
+
+
+def device_key(device):
+    """Plugin identity: device class, parameter count and a hash of the parameter names."""
+    names = "\n".join(p.original_name for p in device.parameters)
+    crc = zlib.crc32(names.encode("utf-8")) & 0xFFFFFFFF
+    return f"{device.class_name}:{len(device.parameters)}:{crc:08x}"
+
+
+def pad_bank(indices, size=BANK_SIZE):
+    indices = list(indices)[:size]
+    return indices + [NO_PARAMETER] * (size - len(indices))
+
+
+def compute_bank_layout(device, size=BANK_SIZE):
+    """Parameter indices of every bank, NO_PARAMETER marks an empty slot."""
+    # The first parameter is the device on/off switch, it has its own button.
+    num_parameters = len(device.parameters)
+    return [pad_bank(range(start, min(start + size, num_parameters)), size) for start in range(1, num_parameters, size)]
+
+
+def compute_max_bank_layout(device, size=BANK_SIZE):
+    return [pad_bank(device.get_bank_parameters(i), size) for i in range(device.get_bank_count())]
+
+
+def resolve_custom_layout(device, banks, size=BANK_SIZE):
+    """Turns banks of parameter names into banks of parameter indices, or
+    returns None if none of the names exist on the device."""
+    indices = {}
+    for index, parameter in enumerate(device.parameters):
+        indices.setdefault(parameter.name, index)
+        indices.setdefault(parameter.original_name, index)
+    layout = [pad_bank([indices.get(name, NO_PARAMETER) for name in bank], size) for bank in banks]
+    if all(index == NO_PARAMETER for bank in layout for index in bank):
+        return None
+    return layout
+
+
+class BankLayoutCache(object):
+    """Bank layouts of the devices whose banks are costly to compute.
+
+    Max device layouts, read bank by bank through the Live API, and user bank
+    customizations are stored on disk and loaded on first access. Device keys
+    are computed once per device and session. Plain plugin layouts are cheaper
+    to compute than their key, so they are neither keyed nor stored.
+
+    Customizations live in `bank_customizations.json` next to the script,
+    mapping a plugin or Max device name, as listed in the browser, to its
+    banks of parameter names, e.g.
+    `{"Serum": [["A Level", "B Level"], ["Env1 Atk", "Env1 Dec"]]}`.
+    They are looked up by `class_display_name`, so renaming a device keeps
+    its layout, and ignored when none of their names exist on the device.
+    Resolved customizations are cached together with the hash of that file
+    and dropped whenever it changes.
+    """
+
+    def __init__(self, path=None, customizations_path=None, *a, **k):
+        super().__init__(*a, **k)
+        self._path = path or cache_path(BANK_CACHE_FILE)
+        self._customizations_path = customizations_path or BANK_CUSTOMIZATIONS_FILE
+        self._layouts = None
+        self._customizations = None
+        self._customizations_crc = None
+        self._keys = {}
+        self._dirty = False
+
+    def _load(self):
+        if self._layouts is not None:
+            return
+        customizations = load_json(self._customizations_path, default={})
+        self._customizations = customizations if isinstance(customizations, dict) else {}
+        customizations_crc = zlib.crc32(repr(sorted(self._customizations.items())).encode("utf-8"))
+        cache = load_json(self._path, default={})
+        layouts = cache.get("layouts") if isinstance(cache, dict) else None
+        self._layouts = layouts if isinstance(layouts, dict) else {}
+        if not isinstance(cache, dict) or cache.get("customizations") != customizations_crc:
+            self._layouts = {key: entry for key, entry in self._layouts.items() if not entry[0]}
+            self._dirty = True
+        self._customizations_crc = customizations_crc
+
+    def _device_key(self, device):
+        key = self._keys.get(device)
+        if key is None:
+            key = self._keys[device] = device_key(device)
+        return key
+
+    def forget(self, device):
+        """Drops the session key of a device whose parameters changed."""
+        self._keys.pop(device, None)
+
+    def layout(self, device, banking_info, size=BANK_SIZE):
+        self._load()
+        custom_banks = self._customizations.get(device.class_display_name)
+        if custom_banks is not None:
+            key = self._device_key(device)
+            entry = self._layouts.get(key)
+            if entry is not None and entry[0]:
+                return entry[1]
+            custom_layout = resolve_custom_layout(device, custom_banks, size)
+            if custom_layout is not None:
+                self.set_custom_layout(device, custom_layout)
+                return self._layouts[key][1]
+        if not banking_info.has_bank_count(device):
+            return compute_bank_layout(device, size)
+        key = self._device_key(device)
+        entry = self._layouts.get(key)
+        if entry is None:
+            entry = self._layouts[key] = [False, compute_max_bank_layout(device, size)]
+            self._dirty = True
+        return entry[1]
+
+    def set_custom_layout(self, device, banks):
+        self._load()
+        self._layouts[self._device_key(device)] = [True, [list(bank) for bank in banks]]
+        self._dirty = True
+
+    def flush(self):
+        if self._dirty:
+            save_json(self._path, {"customizations": self._customizations_crc, "layouts": self._layouts})
+            self._dirty = False
+
+    def disconnect(self):
+        self.flush()
+
+
+class CachedDeviceParameterBank(DeviceParameterBank):
+
+    def __init__(self, cache=None, device=None, banking_info=None, *a, **k):
+        self._cache = cache
+        self._layout = cache.layout(device, banking_info)
+        super().__init__(device=device, banking_info=banking_info, *a, **k)
+        self.__on_device_parameters_changed.subject = device
+
+    @listens("parameters")
+    def __on_device_parameters_changed(self):
+        # The base bank may already have collected from the old layout.
+        self._cache.forget(self._device)
+        self._layout = self._cache.layout(self._device, self._banking_info)
+        self._update_parameters()
+
+    def bank_count(self):
+        return len(self._layout)
+
+    def _collect_parameters(self):
+        parameters = self._device.parameters
+        num_parameters = len(parameters)
+        if self.index >= len(self._layout):
+            return [None] * self._size
+        return [
+            parameters[i] if 0 <= i < num_parameters else None
+            for i in self._layout[self.index]
+        ]
+
+
+def create_cached_device_bank(device, banking_info, cache):
+    bank = None
+    if liveobj_valid(device):
+        if not banking_info.has_bank_count(device) and banking_info.device_bank_definition(device) is not None:
+            bank = DescribedDeviceParameterBank(device=device, size=BANK_SIZE, banking_info=banking_info)
+        else:
+            bank = CachedDeviceParameterBank(
+                cache=cache,
+                device=device,
+                size=BANK_SIZE,
+                banking_info=banking_info,
+            )
+    return bank
+
+
+class CachedBankDeviceComponent(DeviceComponent):
+    """Device component whose plugin and Max banks come from the bank layout cache."""
+
+    def __init__(self, *a, **k):
+        self._bank_layout_cache = BankLayoutCache()
+        super().__init__(*a, **k)
+        self.register_disconnectable(self._bank_layout_cache)
+
+    def _setup_bank(self, device, bank_factory=create_cached_device_bank):
+        if self._bank is not None:
+            self.disconnect_disconnectable(self._bank)
+            self._bank = None
+        if liveobj_valid(device):
+            self._bank = self.register_disconnectable(
+                bank_factory(device, self._banking_info, self._bank_layout_cache)
+            )
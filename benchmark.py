@@ -0,0 +1,134 @@
+import gc
+import tracemalloc
+from collections import namedtuple
+
+CC_STATUS = 176
+NUM_MESSAGES = 100000
+# Steady state allows a little slack for interpreter caches (freelists,
+# method caches) that may grow once during the run.
+MAX_ALLOCATED_BLOCKS = 64
+MAX_ALLOCATED_BYTES = 16 * 1024
+MAX_ALLOCATING_MESSAGES = 100
+MAX_GC_COLLECTIONS = 1
+
+AllocationStats = namedtuple(
+    "AllocationStats",
+    [
+        "num_messages",
+        "allocating_messages",
+        "transient_bytes",
+        "gc_collections",
+        "allocated_blocks",
+        "allocated_bytes",
+    ],
+)
+
+
+def young_collections():
+    return gc.get_stats()[0]["collections"]
+
+
+def synthetic_ccs(encoder_channel, encoder_ids, button_channel, button_ids):
+    """One sweep of every encoder through all 128 values, then a press and
+    release of every button. Messages are built before measuring."""
+    messages = []
+    for value in range(128):
+        for identifier in encoder_ids:
+            messages.append((CC_STATUS + encoder_channel, identifier, value))
+    for identifier in button_ids:
+        messages.append((CC_STATUS + button_channel, identifier, 127))
+        messages.append((CC_STATUS + button_channel, identifier, 0))
+    return tuple(messages)
+
+
+def measure_input_allocations(receive_midi, messages, num_messages=NUM_MESSAGES):
+    """Feeds `num_messages` CCs, cycling through `messages`, to `receive_midi`.
+
+    After a warm-up cycle, the tracemalloc peak is reset before every message,
+    so any object allocated while handling it, even one freed right away,
+    counts that message as allocating and adds to `transient_bytes`. Objects
+    served from interpreter freelists bypass the allocator and are not seen.
+    Young generation collections catch containers that outlive their message,
+    and the blocks and bytes still held after the run catch leaks. Peak
+    tracking needs Python 3.9, before that the per-message figures are None.
+    """
+    for message in messages:
+        receive_midi(message)
+
+    num_cycle_messages = len(messages)
+    track_peaks = hasattr(tracemalloc, "reset_peak")
+    get_traced_memory = tracemalloc.get_traced_memory
+    reset_peak = getattr(tracemalloc, "reset_peak", None)
+    allocating_messages = 0
+    transient_bytes = 0
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    was_enabled = gc.isenabled()
+    gc.enable()
+    collections = young_collections()
+
+    for index in range(num_messages):
+        message = messages[index % num_cycle_messages]
+        if track_peaks:
+            start, _ = get_traced_memory()
+            reset_peak()
+            receive_midi(message)
+            _, peak = get_traced_memory()
+            if peak > start:
+                allocating_messages += 1
+                transient_bytes += peak - start
+        else:
+            receive_midi(message)
+
+    collections = young_collections() - collections
+    if not was_enabled:
+        gc.disable()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    if not was_tracing:
+        tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    return AllocationStats(
+        num_messages=num_messages,
+        allocating_messages=allocating_messages if track_peaks else None,
+        transient_bytes=transient_bytes if track_peaks else None,
+        gc_collections=collections,
+        allocated_blocks=sum(stat.count_diff for stat in stats if stat.count_diff > 0),
+        allocated_bytes=sum(stat.size_diff for stat in stats if stat.size_diff > 0),
+    )
+
+
+def allocation_failures(
+    stats,
+    max_allocating_messages=MAX_ALLOCATING_MESSAGES,
+    max_collections=MAX_GC_COLLECTIONS,
+    max_blocks=MAX_ALLOCATED_BLOCKS,
+    max_bytes=MAX_ALLOCATED_BYTES,
+):
+    """Describes every limit `stats` exceeds, an empty list means the input
+    path is allocation-free."""
+    failures = []
+    if stats.allocating_messages is not None and stats.allocating_messages > max_allocating_messages:
+        failures.append(
+            f"{stats.allocating_messages} of {stats.num_messages} messages allocated "
+            f"({stats.transient_bytes} bytes in total)"
+        )
+    if stats.gc_collections > max_collections:
+        failures.append(f"input path triggered {stats.gc_collections} collections over {stats.num_messages} messages")
+    if stats.allocated_blocks > max_blocks:
+        failures.append(f"input path leaked {stats.allocated_blocks} blocks over {stats.num_messages} messages")
+    if stats.allocated_bytes > max_bytes:
+        failures.append(f"input path grew by {stats.allocated_bytes} bytes over {stats.num_messages} messages")
+    return failures
+
+
+def assert_allocation_free(stats, **limits):
+    failures = allocation_failures(stats, **limits)
+    if failures:
+        raise AssertionError("; ".join(failures))
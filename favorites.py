@@ -0,0 +1,201 @@
+from fnmatch import fnmatchcase
+
+from ableton.v3.base import EventObject, listenable_property, listens, listens_group, liveobj_valid
+from ableton.v3.control_surface import Component
+from ableton.v3.control_surface.controls import MappedControl, control_list
+
+NUM_FAVORITES = 16
+
+# (track, device, parameter) name patterns, one per encoder in row-major
+# order. Patterns use shell wildcards and are matched case-insensitively;
+# each one resolves to its first match in set order (tracks, returns, master),
+# looking into rack chains as well.
+FAVORITE_PARAMETERS = (
+    ("*", "Auto Filter*", "Frequency"),
+    ("*", "Auto Filter*", "Resonance"),
+    ("*", "Reverb*", "Dry/Wet"),
+    ("*", "Delay*", "Dry/Wet"),
+)
+
+
+def collect_devices(devices, found, chains, racks):
+    """Walks a device chain, including the chains of racks and drum racks."""
+    for device in devices:
+        found.append(device)
+        if device.can_have_chains:
+            racks.append(device)
+            for chain in list(device.chains) + list(getattr(device, "return_chains", ())):
+                chains.append(chain)
+                collect_devices(chain.devices, found, chains, racks)
+
+
+class FavoriteParameterIndex(EventObject):
+    """Resolves the favorite patterns against the whole set.
+
+    Devices nested in racks are matched too. Matches are cached per track
+    along with the track that currently provides each pattern. A change to a
+    track's name, devices, rack chains or device parameters only rescans and
+    relistens to that track, so reading `parameters` never walks the set.
+    """
+
+    def __init__(self, song=None, patterns=FAVORITE_PARAMETERS, *a, **k):
+        super().__init__(*a, **k)
+        self._song = song
+        self._patterns = tuple(
+            tuple(p.lower() for p in pattern) for pattern in patterns[:NUM_FAVORITES]
+        )
+        self._tracks = []
+        self._order = {}
+        self._matches = {}
+        self._subjects = {}
+        self._container_tracks = {}
+        self._owners = [None] * len(self._patterns)
+        self._parameters = [None] * NUM_FAVORITES
+        self.__on_tracks_changed.subject = song
+        self.__on_return_tracks_changed.subject = song
+        self.__on_tracks_changed()
+
+    @listenable_property
+    def parameters(self):
+        return self._parameters
+
+    @listens("tracks")
+    def __on_tracks_changed(self):
+        self._update_tracks()
+
+    @listens("return_tracks")
+    def __on_return_tracks_changed(self):
+        self._update_tracks()
+
+    def _update_tracks(self):
+        song = self._song
+        tracks = list(song.tracks) + list(song.return_tracks) + [song.master_track]
+        current = set(tracks)
+        for track in self._tracks:
+            if track not in current:
+                self._forget_track(track)
+        self._tracks = tracks
+        self._order = {track: index for index, track in enumerate(tracks)}
+        self.__on_track_name_changed.replace_subjects(tracks)
+        for track in tracks:
+            if track not in self._matches:
+                self._listen_to_track(track)
+                self._matches[track] = self._match_track(track)
+        self._owners = [self._find_owner(i) for i in range(len(self._patterns))]
+        self._update_parameters()
+
+    def _listen_to_track(self, track):
+        devices, chains, racks = [], [], []
+        if liveobj_valid(track):
+            collect_devices(track.devices, devices, chains, racks)
+        self._subjects[track] = (devices, chains, racks)
+        for container in [track] + chains:
+            self._container_tracks[container] = track
+            self.__on_devices_changed.add_subject(container)
+        for device in devices:
+            self._container_tracks[device] = track
+            self.__on_device_name_changed.add_subject(device)
+            self.__on_device_parameters_changed.add_subject(device)
+        for rack in racks:
+            self.__on_chains_changed.add_subject(rack)
+
+    def _forget_track(self, track):
+        devices, chains, racks = self._subjects.pop(track, ((), (), ()))
+        for container in [track] + list(chains):
+            self._container_tracks.pop(container, None)
+            self.__on_devices_changed.remove_subject(container)
+        for device in devices:
+            self._container_tracks.pop(device, None)
+            self.__on_device_name_changed.remove_subject(device)
+            self.__on_device_parameters_changed.remove_subject(device)
+        for rack in racks:
+            self.__on_chains_changed.remove_subject(rack)
+        self._matches.pop(track, None)
+
+    @listens_group("name")
+    def __on_track_name_changed(self, track):
+        self._rescan_track(track)
+
+    @listens_group("devices")
+    def __on_devices_changed(self, container):
+        self._rescan_track(self._container_tracks.get(container))
+
+    @listens_group("chains")
+    def __on_chains_changed(self, rack):
+        self._rescan_track(self._container_tracks.get(rack))
+
+    @listens_group("name")
+    def __on_device_name_changed(self, device):
+        self._rescan_track(self._container_tracks.get(device))
+
+    @listens_group("parameters")
+    def __on_device_parameters_changed(self, device):
+        self._rescan_track(self._container_tracks.get(device))
+
+    def _rescan_track(self, track):
+        if track not in self._order:
+            return
+        self._forget_track(track)
+        self._listen_to_track(track)
+        matches = self._matches[track] = self._match_track(track)
+        position = self._order[track]
+        for i, parameter in enumerate(matches):
+            owner = self._owners[i]
+            if parameter is not None:
+                if owner is None or position <= self._order[owner]:
+                    self._owners[i] = track
+            elif owner == track:
+                self._owners[i] = self._find_owner(i)
+        self._update_parameters()
+
+    def _find_owner(self, pattern_index):
+        for track in self._tracks:
+            if self._matches[track][pattern_index] is not None:
+                return track
+        return None
+
+    def _match_track(self, track):
+        matches = [None] * len(self._patterns)
+        if not liveobj_valid(track):
+            return matches
+        track_name = track.name.lower()
+        for device in self._subjects[track][0]:
+            device_name = device.name.lower()
+            for i, (track_pattern, device_pattern, parameter_pattern) in enumerate(self._patterns):
+                if matches[i] is not None:
+                    continue
+                if not (fnmatchcase(track_name, track_pattern) and fnmatchcase(device_name, device_pattern)):
+                    continue
+                for parameter in device.parameters:
+                    if fnmatchcase(parameter.name.lower(), parameter_pattern):
+                        matches[i] = parameter
+                        break
+        return matches
+
+    def _update_parameters(self):
+        parameters = [None] * NUM_FAVORITES
+        for i, owner in enumerate(self._owners):
+            if owner is not None:
+                parameters[i] = self._matches[owner][i]
+        if parameters != self._parameters:
+            self._parameters = parameters
+            self.notify_parameters()
+
+
+class FavoritesComponent(Component):
+    parameter_controls = control_list(MappedControl, NUM_FAVORITES)
+
+    def __init__(self, name="Favorites", *a, **k):
+        super().__init__(name=name, *a, **k)
+        self._index = self.register_disconnectable(FavoriteParameterIndex(song=self.song))
+        self.__on_parameters_changed.subject = self._index
+
+    @listens("parameters")
+    def __on_parameters_changed(self):
+        self.update()
+
+    def update(self):
+        super().update()
+        if self.is_enabled():
+            for control, parameter in zip(self.parameter_controls, self._index.parameters):
+                control.mapped_parameter = parameter if liveobj_valid(parameter) else None
@@ -0,0 +1,48 @@
+from ableton.v3.base import listens, liveobj_valid
+from ableton.v3.control_surface.elements import EncoderElement
+
+from .rate_limiter import quantize_value, ring_scale
+
+
+class RateLimitedEncoderElement(EncoderElement):
+    """Encoder whose ring follows its parameter through a FeedbackRateLimiter
+    instead of Live's built-in feedback. The parameter range is read once on
+    connect, so a value change only fetches the value."""
+
+    def __init__(self, identifier, feedback_limiter=None, *a, **k):
+        super().__init__(identifier, *a, **k)
+        self._feedback_limiter = feedback_limiter
+        self._ring_index = identifier
+        self._parameter_min = 0.0
+        self._parameter_scale = 0.0
+        feedback_limiter.register(identifier, self)
+
+    def connect_to(self, parameter):
+        super().connect_to(parameter)
+        self._parameter_min = parameter.min
+        self._parameter_scale = ring_scale(parameter.min, parameter.max)
+        self.__on_parameter_value_changed.subject = parameter
+        self._feedback_limiter.reset(self._ring_index)
+        self.__on_parameter_value_changed()
+
+    def release_parameter(self):
+        self.__on_parameter_value_changed.subject = None
+        super().release_parameter()
+        self._feedback_limiter.reset(self._ring_index)
+
+    def reset(self):
+        super().reset()
+        self._feedback_limiter.reset(self._ring_index)
+
+    @listens("value")
+    def __on_parameter_value_changed(self):
+        parameter = self.__on_parameter_value_changed.subject
+        if liveobj_valid(parameter):
+            self._feedback_limiter.update(
+                self._ring_index,
+                quantize_value(parameter.value, self._parameter_min, self._parameter_scale),
+            )
+
+
+def create_rate_limited_encoder(identifier, name, **k):
+    return RateLimitedEncoderElement(identifier, name=name, **k)
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+
+from .storage import cache_path, load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+SYSEX_START = 240
+SYSEX_END = 247
+MANUFACTURER_ID = (0, 1, 121)
+SYSEX_COMMAND_BULK_XFER = 4
+BULK_XFER_PUSH = 1
+
+HARDWARE_CONFIG_FILE = "hardware_config.json"
+CONTROLS_PER_DEVICE = 16
+
+# Per-encoder settings in the order of the firmware's bulk transfer tags.
+ENCODER_SETTINGS = (
+    "has_detent",
+    "movement",
+    "switch_action_type",
+    "switch_midi_channel",
+    "switch_midi_number",
+    "switch_midi_type",
+    "encoder_midi_channel",
+    "encoder_midi_number",
+    "encoder_midi_type",
+    "active_color",
+    "inactive_color",
+    "detent_color",
+    "indicator_display_type",
+    "is_super_knob",
+    "encoder_shift_midi_channel",
+)
+FIRST_SETTING_TAG = 10
+
+MOVEMENT_DIRECT = 0
+SWITCH_ACTION_CC_HOLD = 0
+SWITCH_MIDI_TYPE_CC = 1
+ENCODER_MIDI_TYPE_ABSOLUTE = 0
+ENCODER_MIDI_TYPE_RELATIVE = 1
+INDICATOR_DOT = 0
+SHIFT_CHANNEL = 4
+
+
+def create_hardware_config(specification):
+    """Lists the settings of every encoder the script expects, unit by unit.
+
+    Identifiers follow TwisterElements: unit k uses 16*k..16*k+15 for both the
+    encoders and their push switches, on their own channels.
+    """
+    encoder_type = ENCODER_MIDI_TYPE_RELATIVE if specification.relative_encoders else ENCODER_MIDI_TYPE_ABSOLUTE
+    config = []
+    for identifier in range(CONTROLS_PER_DEVICE * specification.num_devices):
+        settings = {
+            "has_detent": 0,
+            "movement": MOVEMENT_DIRECT,
+            "switch_action_type": SWITCH_ACTION_CC_HOLD,
+            "switch_midi_channel": specification.button_channel,
+            "switch_midi_number": identifier,
+            "switch_midi_type": SWITCH_MIDI_TYPE_CC,
+            "encoder_midi_channel": specification.encoder_channel,
+            "encoder_midi_number": identifier,
+            "encoder_midi_type": encoder_type,
+            "active_color": specification.active_color,
+            "inactive_color": specification.inactive_color,
+            "detent_color": specification.inactive_color,
+            "indicator_display_type": INDICATOR_DOT,
+            "is_super_knob": 0,
+            "encoder_shift_midi_channel": SHIFT_CHANNEL,
+        }
+        config.append(tuple(settings[name] for name in ENCODER_SETTINGS))
+    return config
+
+
+def hardware_config_messages(config):
+    """One single-part bulk transfer per encoder, tagged with its index:
+
+    F0 00 01 79 04 <push> <encoder + 1> <part=0> <total=1> <size> <tag value ...> F7
+    """
+    messages = []
+    for encoder, values in enumerate(config):
+        payload = []
+        for tag, value in enumerate(values, FIRST_SETTING_TAG):
+            payload.extend((tag, value & 127))
+        messages.append(
+            (SYSEX_START,)
+            + MANUFACTURER_ID
+            + (SYSEX_COMMAND_BULK_XFER, BULK_XFER_PUSH, encoder + 1, 0, 1, len(payload))
+            + tuple(payload)
+            + (SYSEX_END,)
+        )
+    return messages
+
+
+def config_hash(messages):
+    digest = hashlib.sha1()
+    for message in messages:
+        digest.update(bytes(message))
+    return digest.hexdigest()
+
+
+class HardwareConfigUploader(object):
+    """Pushes the hardware config unless it matches the last one sent.
+
+    Messages sent while no Twister is connected are lost while their hash is
+    recorded as pushed; `upload(force=True)` sends them again.
+    """
+
+    def __init__(self, send_midi, path=None, *a, **k):
+        super().__init__(*a, **k)
+        self._send_midi = send_midi
+        self._path = path or cache_path(HARDWARE_CONFIG_FILE)
+
+    def upload(self, specification, force=False):
+        messages = hardware_config_messages(create_hardware_config(specification))
+        digest = config_hash(messages)
+        last = load_json(self._path, default={})
+        if not force and isinstance(last, dict) and last.get("hash") == digest:
+            logger.info("MGTwister2: hardware config unchanged, skipping upload")
+            return False
+        for message in messages:
+            self._send_midi(message)
+        save_json(self._path, {"hash": digest})
+        logger.info(f"MGTwister2: uploaded hardware config ({len(messages)} encoders)")
+        return True
@@ -0,0 +1,188 @@
+from ableton.v3.base import depends, listens, listens_group
+from ableton.v3.control_surface import Component
+from ableton.v3.control_surface.controls import ButtonControl, control_list
+
+# The last button of the unit stays the control mode cycle button.
+NUM_BLOCKS = 15
+
+ARMED = 0
+SOLOED = 1
+PLAYING = 2
+NUM_STATES = 3
+
+# The Twister animates a button's LED from values sent on this channel,
+# independently of its color: 0 stops, 9..16 pulse from slow to fast.
+ANIMATION_CHANNEL = 2
+ANIMATION_OFF = 0
+CURRENT_BLOCK_PULSE = 11
+
+
+def track_state(track, is_return):
+    state = 0
+    if track.can_be_armed and track.arm:
+        state |= 1 << ARMED
+    if track.solo:
+        state |= 1 << SOLOED
+    if not is_return and track.playing_slot_index >= 0:
+        state |= 1 << PLAYING
+    return state
+
+
+class SessionOverviewComponent(Component):
+    """Whole-set overview, one button per block of session ring pages.
+
+    Each block keeps counters of its armed, soloed and playing tracks. Track
+    listeners update the counters of their own block only, so redraws never
+    rescan the set; the full scan only happens when the track list changes.
+    Pressing a button moves the session ring to the start of its block.
+
+    Buttons are colored by the state of their block, and the block the ring is
+    in pulses on top of that color, so the ring stays visible whatever its
+    tracks are doing.
+    """
+
+    block_buttons = control_list(ButtonControl, NUM_BLOCKS)
+
+    @depends(session_ring=None)
+    def __init__(self, name="Session_Overview", session_ring=None, *a, **k):
+        super().__init__(name=name, *a, **k)
+        self._session_ring = session_ring
+        self._tracks = []
+        self._num_visible_tracks = 0
+        self._track_indices = {}
+        self._track_states = []
+        self._block_size = session_ring.num_tracks
+        self._counts = [0] * (NUM_BLOCKS * NUM_STATES)
+        self._block_elements = []
+        self._current_block = None
+        self.__on_visible_tracks_changed.subject = self.song
+        self.__on_return_tracks_changed.subject = self.song
+        self.__on_ring_offset_changed.subject = session_ring
+        self._rebuild()
+
+    @block_buttons.pressed
+    def block_buttons(self, button):
+        track_offset = button.index * self._block_size
+        if track_offset < len(self._tracks):
+            self._session_ring.set_offset(track_offset, self._session_ring.scene_offset)
+
+    def set_block_buttons(self, buttons):
+        self._animate_block(self._current_block, ANIMATION_OFF)
+        self._current_block = None
+        self.block_buttons.set_control_element(buttons)
+        self._block_elements = list(buttons) if buttons is not None else []
+        self._update_block_buttons()
+
+    @listens("visible_tracks")
+    def __on_visible_tracks_changed(self):
+        self._rebuild()
+
+    @listens("return_tracks")
+    def __on_return_tracks_changed(self):
+        self._rebuild()
+
+    @listens("offset")
+    def __on_ring_offset_changed(self, *_):
+        self._update_block_buttons()
+
+    @listens_group("arm")
+    def __on_arm_changed(self, track):
+        self._update_track(track)
+
+    @listens_group("solo")
+    def __on_solo_changed(self, track):
+        self._update_track(track)
+
+    @listens_group("playing_slot_index")
+    def __on_playing_slot_index_changed(self, track):
+        self._update_track(track)
+
+    def _rebuild(self):
+        visible_tracks = list(self.song.visible_tracks)
+        tracks = visible_tracks + list(self.song.return_tracks)
+        page_size = self._session_ring.num_tracks
+        num_pages = -(-len(tracks) // page_size)
+        pages_per_block = max(1, -(-num_pages // NUM_BLOCKS))
+
+        self._tracks = tracks
+        self._num_visible_tracks = len(visible_tracks)
+        self._block_size = pages_per_block * page_size
+        self._track_indices = {track: index for index, track in enumerate(tracks)}
+        self._track_states = []
+        self._counts = [0] * (NUM_BLOCKS * NUM_STATES)
+        for index, track in enumerate(tracks):
+            state = track_state(track, index >= self._num_visible_tracks)
+            self._track_states.append(state)
+            self._add_state(self._block_of(index), state, 1)
+
+        self.__on_arm_changed.replace_subjects([t for t in tracks if t.can_be_armed])
+        self.__on_solo_changed.replace_subjects(tracks)
+        self.__on_playing_slot_index_changed.replace_subjects(visible_tracks)
+        self._update_block_buttons()
+
+    def _block_of(self, track_index):
+        return min(track_index // self._block_size, NUM_BLOCKS - 1)
+
+    def _add_state(self, block, state, delta):
+        base = block * NUM_STATES
+        for kind in range(NUM_STATES):
+            if state & (1 << kind):
+                self._counts[base + kind] += delta
+
+    def _update_track(self, track):
+        index = self._track_indices.get(track)
+        if index is None:
+            return
+        state = track_state(track, index >= self._num_visible_tracks)
+        old_state = self._track_states[index]
+        if state != old_state:
+            block = self._block_of(index)
+            self._add_state(block, old_state, -1)
+            self._add_state(block, state, 1)
+            self._track_states[index] = state
+            self._update_block_button(block)
+
+    def update(self):
+        super().update()
+        self._current_block = None
+        self._update_block_buttons()
+
+    def _update_block_buttons(self):
+        for block in range(NUM_BLOCKS):
+            self._update_block_button(block)
+        self._update_current_block()
+
+    def _update_current_block(self):
+        if not self.is_enabled():
+            return
+        block = None
+        if self._session_ring.track_offset < len(self._tracks):
+            block = self._block_of(self._session_ring.track_offset)
+        if block != self._current_block:
+            self._animate_block(self._current_block, ANIMATION_OFF)
+            self._animate_block(block, CURRENT_BLOCK_PULSE)
+            self._current_block = block
+
+    def _animate_block(self, block, value):
+        if block is None or block >= len(self._block_elements):
+            return
+        element = self._block_elements[block]
+        if element is not None:
+            element.send_value(value, channel=ANIMATION_CHANNEL, force=True)
+
+    def _update_block_button(self, block):
+        if not self.is_enabled():
+            return
+        base = block * NUM_STATES
+        first_track = block * self._block_size
+        button = self.block_buttons[block]
+        if first_track >= len(self._tracks):
+            button.color = "Overview.Empty"
+        elif self._counts[base + ARMED]:
+            button.color = "Overview.Armed"
+        elif self._counts[base + SOLOED]:
+            button.color = "Overview.Soloed"
+        elif self._counts[base + PLAYING]:
+            button.color = "Overview.Playing"
+        else:
+            button.color = "Overview.Tracks"
@@ -0,0 +1,126 @@
+import time
+
+DEFAULT_MAX_REFRESH_RATE = 30
+NO_VALUE = -1
+MAX_RING_VALUE = 127
+COUNTER_BYTES = 8
+
+
+def quantize_value(value, minimum, scale):
+    """Parameter value as the 7-bit value shown by the encoder ring, `scale`
+    being 127 over the parameter range. Truncating the offset float keeps the
+    result in the interpreter's cached small ints, unlike round()."""
+    return int((value - minimum) * scale + 0.5)
+
+
+def ring_scale(minimum, maximum):
+    value_range = maximum - minimum
+    return MAX_RING_VALUE / value_range if value_range > 0 else 0.0
+
+
+def increment(counter):
+    """Adds one to a little-endian byte counter. Only small ints are
+    involved, so counting never allocates, unlike `+= 1` past 256."""
+    index = 0
+    while counter[index] == 255:
+        counter[index] = 0
+        index += 1
+    counter[index] += 1
+
+
+def counter_value(counter):
+    return int.from_bytes(counter, "little")
+
+
+class FeedbackRateLimiter(object):
+    """Caps how often each encoder ring is refreshed.
+
+    Values equal to the last one sent are dropped. Values arriving faster than
+    `max_refresh_rate` are held as pending, replacing any older pending value,
+    and `flush()` sends them once the ring may refresh again, so the final
+    value always makes it to the hardware. `update` runs for every parameter
+    change and does not allocate, its counters are byte counters that are
+    only turned into ints when read.
+    """
+
+    def __init__(self, num_rings, max_refresh_rate=DEFAULT_MAX_REFRESH_RATE, clock=time.monotonic, *a, **k):
+        super().__init__(*a, **k)
+        self._min_interval = 1.0 / max_refresh_rate
+        self._clock = clock
+        self._rings = [None] * num_rings
+        self._last_value = [NO_VALUE] * num_rings
+        self._last_time = [-self._min_interval] * num_rings
+        self._pending = [NO_VALUE] * num_rings
+        self._num_pending = 0
+        self._sent = bytearray(COUNTER_BYTES)
+        self._suppressed_duplicates = bytearray(COUNTER_BYTES)
+        self._suppressed_by_rate = bytearray(COUNTER_BYTES)
+
+    @property
+    def sent(self):
+        return counter_value(self._sent)
+
+    @property
+    def suppressed_duplicates(self):
+        return counter_value(self._suppressed_duplicates)
+
+    @property
+    def suppressed_by_rate(self):
+        return counter_value(self._suppressed_by_rate)
+
+    @property
+    def suppressed(self):
+        return self.suppressed_duplicates + self.suppressed_by_rate
+
+    def describe_counters(self):
+        return (
+            f"sent {self.sent}, suppressed {self.suppressed} "
+            f"({self.suppressed_duplicates} duplicates, {self.suppressed_by_rate} over rate)"
+        )
+
+    def register(self, index, ring):
+        self._rings[index] = ring
+
+    def reset(self, index):
+        """Forgets what the ring shows, e.g. after its LEDs were reset."""
+        self._last_value[index] = NO_VALUE
+        self._clear_pending(index)
+
+    def update(self, index, value):
+        if value == self._last_value[index]:
+            increment(self._suppressed_duplicates)
+            if self._pending[index] != NO_VALUE:
+                increment(self._suppressed_by_rate)
+                self._clear_pending(index)
+            return
+        now = self._clock()
+        if now - self._last_time[index] >= self._min_interval:
+            self._clear_pending(index)
+            self._send(index, value, now)
+        else:
+            if self._pending[index] == NO_VALUE:
+                self._num_pending += 1
+            else:
+                increment(self._suppressed_by_rate)
+            self._pending[index] = value
+
+    def flush(self):
+        if self._num_pending == 0:
+            return
+        now = self._clock()
+        for index in range(len(self._pending)):
+            value = self._pending[index]
+            if value != NO_VALUE and now - self._last_time[index] >= self._min_interval:
+                self._clear_pending(index)
+                self._send(index, value, now)
+
+    def _clear_pending(self, index):
+        if self._pending[index] != NO_VALUE:
+            self._pending[index] = NO_VALUE
+            self._num_pending -= 1
+
+    def _send(self, index, value, now):
+        self._last_value[index] = value
+        self._last_time[index] = now
+        increment(self._sent)
+        self._rings[index].send_value(value, force=True)
@@ -0,0 +1,38 @@
+import logging
+import os
+
+from ableton.v3.control_surface import Skin
+from ableton.v3.control_surface.elements import SimpleColor
+
+from .storage import load_json
+
+logger = logging.getLogger(__name__)
+
+THEME_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "theme.json")
+
+
+def is_midi_value(value):
+    # JSON booleans load as bool, which is an int subclass.
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < 128
+
+
+class ThemedSkin(Skin):
+    """Skin whose colors can be replaced from a theme file."""
+
+    def load_theme(self, path=THEME_FILE):
+        """Swaps in the `{"Mixer.MuteOn": 69, ...}` MIDI values stored in `path`.
+
+        The new colors are built aside and replace the skin's color dict in one
+        step. Returns whether a theme was applied.
+        """
+        theme = load_json(path)
+        if not isinstance(theme, dict):
+            return False
+        colors = dict(self._colors)
+        for name, value in theme.items():
+            if name not in colors or not is_midi_value(value):
+                logger.warning(f"MGTwister2: ignoring theme entry {name}: {value}")
+                continue
+            colors[name] = SimpleColor(value)
+        self._colors = colors
+        return True
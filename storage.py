@@ -0,0 +1,34 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+
+def cache_path(filename):
+    return os.path.join(CACHE_DIR, filename)
+
+
+def load_json(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logger.warning(f"MGTwister2: could not read {path}: {e}")
+        return default
+
+
+def save_json(path, data):
+    """Writes `data` compactly, replacing the file atomically."""
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"MGTwister2: could not write {path}: {e}")
@@ -0,0 +1,13 @@
+import os
+import sys
+import types
+
+# The pure Python helpers are imported from the script package without
+# running its __init__, which needs Live.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "mgtwister2"
+
+if PACKAGE not in sys.modules:
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [ROOT]
+    sys.modules[PACKAGE] = package
@@ -0,0 +1,70 @@
+import pytest
+
+from mgtwister2.benchmark import allocation_failures, assert_allocation_free, measure_input_allocations, synthetic_ccs
+from mgtwister2.rate_limiter import FeedbackRateLimiter, quantize_value, ring_scale
+
+MESSAGES = synthetic_ccs(encoder_channel=0, encoder_ids=range(16), button_channel=1, button_ids=range(8))
+
+
+def test_synthetic_ccs():
+    assert len(MESSAGES) == 128 * 16 + 2 * 8
+    assert MESSAGES[0] == (176, 0, 0)
+    assert MESSAGES[-1] == (177, 7, 0)
+
+
+def test_allocation_free_handler_passes():
+    state = [0] * 128
+
+    def receive_midi(message):
+        state[message[1]] = message[2]
+
+    stats = measure_input_allocations(receive_midi, MESSAGES)
+    assert stats.num_messages == 100000
+    assert stats.allocating_messages <= 10
+    assert_allocation_free(stats)
+
+
+def test_short_lived_allocations_fail():
+    def receive_midi(message):
+        values = [message[1], message[2]]
+        info = {"id": message[1]}
+        name = f"cc {values} {info}"
+        return name
+
+    stats = measure_input_allocations(receive_midi, MESSAGES)
+    assert stats.allocating_messages == stats.num_messages
+    assert stats.transient_bytes > 0
+    assert allocation_failures(stats)
+    with pytest.raises(AssertionError):
+        assert_allocation_free(stats)
+
+
+def test_leaks_fail():
+    received = []
+
+    stats = measure_input_allocations(received.append, MESSAGES)
+    assert stats.allocated_bytes > 0
+    with pytest.raises(AssertionError):
+        assert_allocation_free(stats)
+
+
+class Ring(object):
+    def send_value(self, value, force=False):
+        pass
+
+
+def test_encoder_feedback_path_is_allocation_free():
+    """What RateLimitedEncoderElement does for every parameter change: scale
+    the value to the ring and hand it to the limiter."""
+    limiter = FeedbackRateLimiter(16)
+    for index in range(16):
+        limiter.register(index, Ring())
+    minimum = -1.0
+    scale = ring_scale(minimum, 1.0)
+    parameter_values = [minimum + 2.0 * value / 127 for value in range(128)]
+
+    def receive_midi(message):
+        limiter.update(message[1], quantize_value(parameter_values[message[2]], minimum, scale))
+
+    stats = measure_input_allocations(receive_midi, MESSAGES)
+    assert allocation_failures(stats) == []
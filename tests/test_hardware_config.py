@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from mgtwister2.hardware_config import (
+    ENCODER_MIDI_TYPE_ABSOLUTE,
+    ENCODER_MIDI_TYPE_RELATIVE,
+    ENCODER_SETTINGS,
+    FIRST_SETTING_TAG,
+    HardwareConfigUploader,
+    create_hardware_config,
+    hardware_config_messages,
+)
+
+
+def create_specification(num_devices=2, relative_encoders=False):
+    return SimpleNamespace(
+        num_devices=num_devices,
+        encoder_channel=0,
+        button_channel=1,
+        relative_encoders=relative_encoders,
+        active_color=64,
+        inactive_color=0,
+    )
+
+
+def settings_of(config, encoder):
+    return dict(zip(ENCODER_SETTINGS, config[encoder]))
+
+
+def test_config_covers_every_unit():
+    config = create_hardware_config(create_specification(num_devices=2))
+    assert len(config) == 32
+    for encoder in (0, 15, 16, 31):
+        settings = settings_of(config, encoder)
+        assert settings["encoder_midi_channel"] == 0
+        assert settings["encoder_midi_number"] == encoder
+        assert settings["switch_midi_channel"] == 1
+        assert settings["switch_midi_number"] == encoder
+        assert settings["encoder_midi_type"] == ENCODER_MIDI_TYPE_ABSOLUTE
+
+
+def test_relative_encoders():
+    config = create_hardware_config(create_specification(relative_encoders=True))
+    assert settings_of(config, 0)["encoder_midi_type"] == ENCODER_MIDI_TYPE_RELATIVE
+
+
+def test_message_framing():
+    config = create_hardware_config(create_specification(num_devices=1))
+    messages = hardware_config_messages(config)
+    assert len(messages) == 16
+    for encoder, message in enumerate(messages):
+        size = 2 * len(ENCODER_SETTINGS)
+        assert message[:10] == (0xF0, 0x00, 0x01, 0x79, 0x04, 0x01, encoder + 1, 0x00, 0x01, size)
+        assert message[-1] == 0xF7
+        assert len(message) == 10 + size + 1
+        payload = message[10:-1]
+        assert payload[0::2] == tuple(range(FIRST_SETTING_TAG, FIRST_SETTING_TAG + len(ENCODER_SETTINGS)))
+        assert payload[1::2] == config[encoder]
+        assert all(0 <= byte < 128 for byte in message[1:-1])
+
+
+def test_upload_skips_unchanged_config(tmp_path):
+    path = str(tmp_path / "hardware_config.json")
+    specification = create_specification()
+    sent = []
+
+    assert HardwareConfigUploader(sent.append, path=path).upload(specification)
+    assert len(sent) == 32
+    assert sent == hardware_config_messages(create_hardware_config(specification))
+
+    assert not HardwareConfigUploader(sent.append, path=path).upload(specification)
+    assert len(sent) == 32
+
+
+def test_upload_sends_changed_or_forced_config(tmp_path):
+    path = str(tmp_path / "hardware_config.json")
+    sent = []
+    uploader = HardwareConfigUploader(sent.append, path=path)
+    uploader.upload(create_specification())
+
+    assert uploader.upload(create_specification(), force=True)
+    assert len(sent) == 64
+
+    assert uploader.upload(create_specification(relative_encoders=True))
+    assert len(sent) == 96
@@ -0,0 +1,129 @@
+from mgtwister2.benchmark import assert_allocation_free, measure_input_allocations, synthetic_ccs
+from mgtwister2.rate_limiter import FeedbackRateLimiter, counter_value, increment, quantize_value, ring_scale
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRing(object):
+    def __init__(self):
+        self.values = []
+
+    def send_value(self, value, force=False):
+        self.values.append(value)
+
+
+def create_limiter(num_rings=2, max_refresh_rate=10):
+    clock = FakeClock()
+    limiter = FeedbackRateLimiter(num_rings, max_refresh_rate=max_refresh_rate, clock=clock)
+    rings = [FakeRing() for _ in range(num_rings)]
+    for index, ring in enumerate(rings):
+        limiter.register(index, ring)
+    return limiter, rings, clock
+
+
+def test_first_value_is_sent_immediately():
+    limiter, rings, _ = create_limiter()
+    limiter.update(0, 64)
+    assert rings[0].values == [64]
+    assert rings[1].values == []
+    assert limiter.sent == 1
+
+
+def test_duplicates_are_suppressed():
+    limiter, rings, clock = create_limiter()
+    limiter.update(0, 64)
+    clock.now = 1.0
+    limiter.update(0, 64)
+    assert rings[0].values == [64]
+    assert limiter.suppressed_duplicates == 1
+    assert limiter.suppressed_by_rate == 0
+
+
+def test_trailing_update_is_sent_on_flush():
+    limiter, rings, clock = create_limiter()
+    limiter.update(0, 10)
+    clock.now = 0.01
+    limiter.update(0, 20)
+    limiter.update(0, 30)
+    limiter.flush()
+    assert rings[0].values == [10]
+    assert limiter.suppressed_by_rate == 1
+
+    clock.now = 0.1
+    limiter.flush()
+    assert rings[0].values == [10, 30]
+    assert limiter.sent == 2
+
+    limiter.flush()
+    assert rings[0].values == [10, 30]
+
+
+def test_returning_to_the_shown_value_drops_the_pending_one():
+    limiter, rings, clock = create_limiter()
+    limiter.update(0, 10)
+    clock.now = 0.01
+    limiter.update(0, 20)
+    limiter.update(0, 10)
+    clock.now = 0.1
+    limiter.flush()
+    assert rings[0].values == [10]
+    assert limiter.suppressed_duplicates == 1
+    assert limiter.suppressed_by_rate == 1
+
+
+def test_rings_are_limited_independently():
+    limiter, rings, clock = create_limiter()
+    limiter.update(0, 10)
+    clock.now = 0.01
+    limiter.update(1, 20)
+    assert rings[1].values == [20]
+
+
+def test_reset_resends_the_same_value():
+    limiter, rings, clock = create_limiter()
+    limiter.update(0, 10)
+    clock.now = 0.01
+    limiter.update(0, 20)
+    limiter.reset(0)
+    clock.now = 0.1
+    limiter.flush()
+    assert rings[0].values == [10]
+    limiter.update(0, 10)
+    assert rings[0].values == [10, 10]
+    assert limiter.suppressed == 0
+
+
+def test_counters_carry_over_bytes():
+    counter = bytearray(8)
+    for _ in range(70000):
+        increment(counter)
+    assert counter_value(counter) == 70000
+
+
+def test_quantize_value():
+    scale = ring_scale(-1.0, 1.0)
+    assert quantize_value(-1.0, -1.0, scale) == 0
+    assert quantize_value(0.0, -1.0, scale) == 64
+    assert quantize_value(1.0, -1.0, scale) == 127
+    assert [quantize_value(v / 127.0, 0.0, ring_scale(0.0, 1.0)) for v in range(128)] == list(range(128))
+    assert ring_scale(1.0, 1.0) == 0.0
+
+
+def test_update_does_not_allocate():
+    limiter = FeedbackRateLimiter(16)
+    for index in range(16):
+        limiter.register(index, FakeRing())
+
+    def receive_midi(message):
+        limiter.update(message[1], message[2])
+
+    messages = synthetic_ccs(encoder_channel=0, encoder_ids=range(16), button_channel=1, button_ids=())
+    stats = measure_input_allocations(receive_midi, messages)
+    assert limiter.sent + limiter.suppressed > 100000
+    assert_allocation_free(stats)
@@ -0,0 +1,148 @@
+import colorsys
+
+from ableton.v3.base import depends, listens, listens_group, liveobj_valid
+from ableton.v3.control_surface import Component
+from ableton.v3.control_surface.controls import ButtonControl, control_list
+from ableton.v3.control_surface.elements import SimpleColor
+
+# The Twister maps 1..126 around the hue wheel, starting at blue (240 degrees)
+# and moving towards green, yellow, red and purple.
+FIRST_HUE_INDEX = 1
+NUM_HUES = 126
+FIRST_HUE_DEGREES = 240.0
+NO_HUE = 0
+
+QUANTIZE_BITS = 4
+MIN_SATURATION = 0.2
+MIN_BRIGHTNESS = 0.1
+
+HUE_COLORS = tuple(SimpleColor(value) for value in range(128))
+
+
+def hue_index(hue_degrees):
+    step = 360.0 / NUM_HUES
+    return int(round((FIRST_HUE_DEGREES - hue_degrees) / step)) % NUM_HUES + FIRST_HUE_INDEX
+
+
+def create_palette_lut(bits=QUANTIZE_BITS):
+    """Nearest Twister hue for every quantized RGB color, NO_HUE for greys."""
+    levels = 1 << bits
+    lut = bytearray(levels ** 3)
+    for r in range(levels):
+        for g in range(levels):
+            for b in range(levels):
+                hue, saturation, brightness = colorsys.rgb_to_hsv(
+                    (r + 0.5) / levels, (g + 0.5) / levels, (b + 0.5) / levels
+                )
+                if saturation < MIN_SATURATION or brightness < MIN_BRIGHTNESS:
+                    continue
+                lut[(r * levels + g) * levels + b] = hue_index(hue * 360.0)
+    return bytes(lut)
+
+
+PALETTE_LUT = create_palette_lut()
+
+
+def live_color_to_hue_index(color):
+    """Maps a Live 0xRRGGBB color to a Twister hue index with one table lookup."""
+    shift = 8 - QUANTIZE_BITS
+    mask = (1 << QUANTIZE_BITS) - 1
+    r = (color >> (16 + shift)) & mask
+    g = (color >> (8 + shift)) & mask
+    b = (color >> shift) & mask
+    return PALETTE_LUT[(((r << QUANTIZE_BITS) | g) << QUANTIZE_BITS) | b]
+
+
+class TrackSelectComponent(Component):
+    """Track select buttons lit with the color of their track.
+
+    Colors are refreshed per track from color listeners, and for the whole
+    ring when it moves. The ring's tracks are only rebuilt from its `tracks`
+    event; `offset` merely repaints, and a button is only sent a color when
+    it differs from the one it shows.
+    """
+
+    track_select_buttons = control_list(ButtonControl)
+
+    @depends(session_ring=None)
+    def __init__(self, name="Track_Select", session_ring=None, *a, **k):
+        super().__init__(name=name, *a, **k)
+        self._session_ring = session_ring
+        self._tracks = []
+        self._colors = [None] * session_ring.num_tracks
+        self.track_select_buttons.control_count = session_ring.num_tracks
+        self.__on_ring_tracks_changed.subject = session_ring
+        self.__on_ring_offset_changed.subject = session_ring
+        # Kept so presses and repaints do not create a new view wrapper each time.
+        self._song_view = self.song.view
+        self.__on_selected_track_changed.subject = self._song_view
+        self._update_tracks()
+
+    @track_select_buttons.pressed
+    def track_select_buttons(self, button):
+        track = self._track_at(button.index)
+        if liveobj_valid(track):
+            self._song_view.selected_track = track
+
+    @listens("tracks")
+    def __on_ring_tracks_changed(self):
+        self._update_tracks()
+
+    @listens("offset")
+    def __on_ring_offset_changed(self, *_):
+        self._update_colors()
+
+    @listens("selected_track")
+    def __on_selected_track_changed(self):
+        self._update_colors()
+
+    @listens_group("color")
+    def __on_track_color_changed(self, track):
+        selected_track = self._song_view.selected_track
+        for index, controlled in enumerate(self._tracks):
+            if controlled == track:
+                self._update_color(index, selected_track)
+
+    def _track_at(self, index):
+        if index < len(self._tracks):
+            return self._tracks[index]
+        return None
+
+    def _update_tracks(self):
+        self._tracks = list(self._session_ring.controlled_tracks())
+        self.__on_track_color_changed.replace_subjects(
+            [track for track in self._tracks if liveobj_valid(track)]
+        )
+        self._update_colors()
+
+    def set_track_select_buttons(self, buttons):
+        self.track_select_buttons.set_control_element(buttons)
+        self._colors = [None] * len(self._colors)
+        self._update_colors()
+
+    def update(self):
+        super().update()
+        self._colors = [None] * len(self._colors)
+        self._update_colors()
+
+    def _update_colors(self):
+        if not self.is_enabled():
+            return
+        selected_track = self._song_view.selected_track
+        for index in range(len(self.track_select_buttons)):
+            self._update_color(index, selected_track)
+
+    def _update_color(self, index, selected_track):
+        if not self.is_enabled():
+            return
+        track = self._track_at(index)
+        if not liveobj_valid(track):
+            color = "Mixer.NoTrack"
+        elif track == selected_track:
+            color = "Mixer.Selected"
+        else:
+            hue = live_color_to_hue_index(track.color)
+            color = HUE_COLORS[hue] if hue != NO_HUE else "Mixer.NotSelected"
+        if color is not self._colors[index]:
+            self._colors[index] = color
+            self.track_select_buttons[index].color = color